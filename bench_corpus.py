@@ -0,0 +1,314 @@
+
+import os
+import json
+import zlib
+import random
+
+# Synthetic PDF corpus for benchmark.py.
+# PDFs are written by hand (standard Type1 fonts, no dependencies) so the layouts are
+# fully controlled and the ground-truth Introduction text is known exactly.
+
+LAYOUTS = ['one_column', 'two_column', 'drop_cap', 'spaced_header', 'scanned']
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 72
+BODY_SIZE = 10
+LEADING = 12
+COLUMN_GAP = 24
+# Average Helvetica glyph width relative to font size (used for line wrapping only)
+AVG_CHAR_WIDTH = 0.5
+
+# Vocabulary avoids words used as section titles ("Background", "Method", "Results", ...)
+# so that the regex fallback cannot stop early on body text.
+WORDS = ("the a of and to in we our this that with for on by as is are be can from an "
+         "language detection event neural network data training corpus retrieval paper "
+         "approach propose show study task tasks performance generation prompt prompts "
+         "representation representations transformer transformers encoder decoder sequence "
+         "benchmark benchmarks improve improves baseline baselines robust efficient scalable "
+         "annotated annotation supervision signal signals evaluate evaluation large small "
+         "pretrained synthetic real settings scarce resource resources extract extraction "
+         "structure structured document documents layout layouts section sections text").split()
+
+TITLE_WORDS = ("Learning Detecting Scalable Robust Efficient Neural Event Language Document "
+               "Retrieval Generation Synthetic Structured Layout Aware Transformers Prompting").split()
+
+
+def _sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 18))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng, sentences):
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def _wrap(text, width, size):
+    """
+    Greedy word wrap using an average glyph width estimate.
+    """
+    max_chars = max(10, int(width / (size * AVG_CHAR_WIDTH)))
+    lines, line = [], ""
+    for word in text.split():
+        candidate = f"{line} {word}" if line else word
+        if len(candidate) > max_chars and line:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+class _PdfWriter:
+    """
+    Minimal PDF 1.4 writer: text runs in Helvetica / Helvetica-Bold and optional raster images.
+    """
+    def __init__(self):
+        self.pages = []     # list of (content_stream, images)
+
+    def add_page(self, runs, images=()):
+        ops = []
+        for font, size, x, y, text in runs:
+            ops.append(f"BT /{font} {size} Tf 1 0 0 1 {x:.2f} {y:.2f} Tm ({_escape(text)}) Tj ET")
+        for idx, (x, y, w, h, _) in enumerate(images):
+            ops.append(f"q {w} 0 0 {h} {x} {y} cm /Im{idx} Do Q")
+        self.pages.append(("\n".join(ops) + "\n", list(images)))
+
+    def tobytes(self):
+        objects = [None, None]  # 1: catalog, 2: pages (filled in below)
+        objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+        page_ids = []
+        for content, images in self.pages:
+            image_refs = []
+            for _, _, _, _, (img_w, img_h, pixels) in images:
+                data = zlib.compress(pixels)
+                objects.append((f"<< /Type /XObject /Subtype /Image /Width {img_w} /Height {img_h} "
+                                f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode "
+                                f"/Length {len(data)} >>", data))
+                image_refs.append(len(objects))
+            data = content.encode('cp1252', errors='replace')
+            objects.append((f"<< /Length {len(data)} >>", data))
+            content_id = len(objects)
+            xobjects = " ".join(f"/Im{i} {ref} 0 R" for i, ref in enumerate(image_refs))
+            objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                           f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> /XObject << {xobjects} >> >> "
+                           f"/Contents {content_id} 0 R >>")
+            page_ids.append(len(objects))
+        objects[0] = "<< /Type /Catalog /Pages 2 0 R >>"
+        objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for num, obj in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += f"{num} 0 obj\n".encode()
+            if isinstance(obj, tuple):
+                out += obj[0].encode() + b"\nstream\n" + obj[1] + b"\nendstream"
+            else:
+                out += obj.encode()
+            out += b"\nendobj\n"
+        xref = len(out)
+        out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+        out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+        out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        return bytes(out)
+
+
+class _Flow:
+    """
+    Flows lines top-to-bottom through columns and pages.
+    """
+    def __init__(self, writer, columns, top):
+        self.writer = writer
+        self.columns = columns          # list of (x, width)
+        self.column = 0
+        self.y = top
+        self.runs = []
+
+    @property
+    def x(self):
+        return self.columns[self.column][0]
+
+    @property
+    def width(self):
+        return self.columns[self.column][1]
+
+    def _advance(self, height):
+        if self.y - height < MARGIN:
+            self.column += 1
+            if self.column == len(self.columns):
+                self.finish_page()
+                self.column = 0
+            self.y = PAGE_HEIGHT - MARGIN
+        self.y -= height
+
+    def line(self, runs, height=LEADING):
+        """
+        Place one visual line made of (font, size, dx, text) runs.
+        """
+        self._advance(height)
+        for font, size, dx, text in runs:
+            self.runs.append((font, size, self.x + dx, self.y, text))
+
+    def skip(self, height):
+        self._advance(height)
+
+    def finish_page(self):
+        self.writer.add_page(self.runs)
+        self.runs = []
+
+
+def _small_caps_header(numeral, name):
+    """
+    IEEE style "II. R ELATED WORK": capital at body size, rest in smaller caps.
+    Rendered at body size, so it is invisible to font-size analysis.
+    """
+    head = f"{numeral}. {name[0]}"
+    return [('F1', BODY_SIZE, 0, head), ('F1', 8, len(head) * BODY_SIZE * 0.7 + 2, name[1:].upper())]
+
+
+def _headers(layout):
+    """
+    (intro header runs, next section header runs) for the layout.
+    """
+    if layout == 'spaced_header':
+        return _small_caps_header("I", "Introduction"), _small_caps_header("II", "Related Work")
+    return [('F2', 12, 0, "1 Introduction")], [('F2', 12, 0, "2 Related Work")]
+
+
+def make_document(layout, seed):
+    """
+    Build one synthetic paper.
+    Returns (pdf_bytes, meta) where meta['expected'] is the ground-truth Introduction (None if unreadable).
+    """
+    rng = random.Random(f"{layout}-{seed}")
+    title = " ".join(rng.sample(TITLE_WORDS, 6))
+    abstract = _paragraph(rng, 5)
+    intro_paragraphs = [_paragraph(rng, rng.randint(4, 7)) for _ in range(rng.randint(2, 4))]
+    later_sections = [(f"{n} {name}", [_paragraph(rng, 6) for _ in range(3)])
+                      for n, name in [(3, "Approach"), (4, "Evaluation")]]
+    related = [_paragraph(rng, 6) for _ in range(2)]
+
+    writer = _PdfWriter()
+    meta = {"layout": layout, "seed": seed, "title": title, "abstract": abstract,
+            "expected": "\n".join(intro_paragraphs)}
+
+    if layout == 'scanned':
+        # Image-only pages: no text layer at all
+        img_rng = random.Random(seed)
+        for _ in range(2):
+            pixels = bytes(img_rng.choice((0, 255, 230)) for _ in range(200 * 260))
+            writer.add_page([], images=[(MARGIN, MARGIN, PAGE_WIDTH - 2 * MARGIN, PAGE_HEIGHT - 2 * MARGIN,
+                                         (200, 260, pixels))])
+        meta["expected"] = None
+        return writer.tobytes(), meta
+
+    full_width = PAGE_WIDTH - 2 * MARGIN
+    if layout == 'two_column':
+        col_width = (full_width - COLUMN_GAP) / 2
+        columns = [(MARGIN, col_width), (MARGIN + col_width + COLUMN_GAP, col_width)]
+    else:
+        columns = [(MARGIN, full_width)]
+
+    # Title block spans the full width
+    title_flow = _Flow(writer, [(MARGIN, full_width)], PAGE_HEIGHT - MARGIN)
+    for line in _wrap(title, full_width, 16):
+        title_flow.line([('F2', 16, 0, line)], height=20)
+    title_flow.skip(LEADING)
+
+    flow = _Flow(writer, columns, title_flow.y)
+    flow.runs = title_flow.runs
+    intro_header, next_header = _headers(layout)
+
+    def section(header_runs, paragraphs, drop_cap=False):
+        flow.skip(LEADING / 2)
+        flow.line(header_runs, height=16)
+        for p_idx, paragraph in enumerate(paragraphs):
+            if drop_cap and p_idx == 0:
+                # Large initial letter spanning two lines; first two lines are indented
+                first, rest = paragraph[0], paragraph[1:]
+                lines = _wrap(rest, flow.width - 26, BODY_SIZE)
+                flow.line([('F1', BODY_SIZE, 26, lines[0])])
+                # Drop cap baseline sits on the second line, like typeset papers
+                flow.runs.append(('F2', 28, flow.x, flow.y - LEADING, first))
+                head = _wrap(" ".join(lines[1:]), flow.width - 26, BODY_SIZE)
+                if head:
+                    flow.line([('F1', BODY_SIZE, 26, head[0])])
+                for line in _wrap(" ".join(head[1:]), flow.width, BODY_SIZE):
+                    flow.line([('F1', BODY_SIZE, 0, line)])
+            else:
+                for line in _wrap(paragraph, flow.width, BODY_SIZE):
+                    flow.line([('F1', BODY_SIZE, 0, line)])
+
+    section([('F2', 12, 0, "Abstract")], [abstract])
+    section(intro_header, intro_paragraphs, drop_cap=(layout == 'drop_cap'))
+    section(next_header, related)
+    for heading, paragraphs in later_sections:
+        if layout == 'spaced_header':
+            number, name = heading.split(" ", 1)
+            runs = _small_caps_header({"3": "III", "4": "IV"}[number], name)
+        else:
+            runs = [('F2', 12, 0, heading)]
+        section(runs, paragraphs)
+    flow.finish_page()
+    return writer.tobytes(), meta
+
+
+def generate_corpus(output_dir, docs_per_layout=4, seed=0):
+    """
+    Write the corpus PDFs and a manifest.json into `output_dir`. Returns the manifest list.
+
+    Every document is served as a direct PDF; every third one is additionally reached
+    through an HTML landing page. Each layout also gets one extra paper that is only
+    available behind a 403.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = []
+    for layout in LAYOUTS:
+        for i in range(docs_per_layout):
+            pdf, meta = make_document(layout, seed * 1000 + i)
+            name = f"{layout}-{i:03d}"
+            with open(os.path.join(output_dir, f"{name}.pdf"), 'wb') as f:
+                f.write(pdf)
+            meta.update({
+                "name": name,
+                "file": f"{name}.pdf",
+                "paperId": f"bench-{name}",
+                "doi": f"10.5555/bench.{name}",
+                "route": "landing" if i % 3 == 2 else "pdf",
+                "bytes": len(pdf),
+            })
+            manifest.append(meta)
+        # A separate paper (own title and abstract, so dedup keeps it) whose only source is
+        # behind a 403; it reuses the last PDF file because the body is never served.
+        rng = random.Random(f"{layout}-{seed}-forbidden")
+        forbidden = dict(manifest[-1])
+        forbidden.update({"name": f"{layout}-forbidden", "paperId": f"bench-{layout}-forbidden",
+                          "doi": f"10.5555/bench.{layout}-forbidden", "route": "forbidden",
+                          "title": " ".join(rng.sample(TITLE_WORDS, 6)) + " (mirror)",
+                          "abstract": _paragraph(rng, 5), "expected": None})
+        manifest.append(forbidden)
+
+    with open(os.path.join(output_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+    return manifest
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate the synthetic benchmark PDF corpus.")
+    parser.add_argument("output", type=str, help="Directory to write PDFs and manifest.json into.")
+    parser.add_argument("--docs-per-layout", type=int, default=4, help="Documents per layout (default: 4).")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed (default: 0).")
+    args = parser.parse_args()
+
+    docs = generate_corpus(args.output, args.docs_per_layout, args.seed)
+    print(f"Wrote {len(docs)} documents to {args.output}")
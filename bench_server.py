@@ -0,0 +1,153 @@
+
+import os
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-in for the Semantic Scholar search API and PDF hosts used by benchmark.py.
+#
+#   GET /graph/v1/paper/search?query=..&offset=..&limit=..   fake search API (paginated JSON)
+#   GET /pdf/<file>                                           application/pdf
+#   GET /landing/<file>                                       HTML page with a citation_pdf_url meta tag
+#   GET /forbidden/<file>                                     403 (anti-bot protection)
+
+LANDING_PAGE = """<html><head>
+<meta name="citation_title" content="{title}">
+<meta name="citation_pdf_url" content="{pdf_url}">
+</head><body><h1>{title}</h1></body></html>"""
+
+
+def paper_route(doc):
+    """
+    Path under which the stand-in server exposes this document.
+    """
+    return f"{doc['route']}/{doc['file']}"
+
+
+def _search_record(doc, base_url):
+    return {
+        "paperId": doc["paperId"],
+        "title": doc["title"],
+        "abstract": doc["abstract"],
+        "url": f"{base_url}/paper/{doc['paperId']}",
+        "openAccessPdf": {"url": f"{base_url}/{paper_route(doc)}", "status": "GREEN"},
+        "externalIds": {"DOI": doc["doi"]},
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Set on the server instance: corpus_dir, manifest, delay_s
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        if self.server.delay_s:
+            time.sleep(self.server.delay_s)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip("/").split("/", 1)
+
+        if parsed.path == "/graph/v1/paper/search":
+            params = parse_qs(parsed.query)
+            offset = int(params.get("offset", ["0"])[0])
+            limit = int(params.get("limit", ["100"])[0])
+            docs = self.server.manifest
+            page = [_search_record(d, self._base_url()) for d in docs[offset:offset + limit]]
+            result = {"total": len(docs), "offset": offset, "data": page}
+            if offset + limit < len(docs):
+                result["next"] = offset + limit
+            return self._send(200, json.dumps(result).encode("utf-8"), "application/json")
+
+        if len(parts) == 2 and parts[0] in ("pdf", "landing", "forbidden"):
+            route, filename = parts
+            path = os.path.join(self.server.corpus_dir, os.path.basename(filename))
+            if not os.path.exists(path):
+                return self._send(404, b"not found", "text/plain")
+            if route == "forbidden":
+                return self._send(403, b"<html><body>Access Denied</body></html>", "text/html")
+            if route == "landing":
+                html = LANDING_PAGE.format(title=filename, pdf_url=f"{self._base_url()}/pdf/{filename}")
+                return self._send(200, html.encode("utf-8"), "text/html; charset=utf-8")
+            with open(path, "rb") as f:
+                return self._send(200, f.read(), "application/pdf")
+
+        return self._send(404, json.dumps({"error": "Not found"}).encode("utf-8"), "application/json")
+
+
+class StandInServer:
+    """
+    Runs the stand-in HTTP server on 127.0.0.1 in a background thread.
+
+        with StandInServer(corpus_dir, manifest) as server:
+            search_and_save("query", api_url=server.api_url)
+    """
+    def __init__(self, corpus_dir, manifest=None, delay_s=0.0, port=0):
+        if manifest is None:
+            with open(os.path.join(corpus_dir, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.corpus_dir = corpus_dir
+        self.httpd.manifest = manifest
+        self.httpd.delay_s = delay_s
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self):
+        """
+        Value for SemanticScholar(api_url=...) / search_and_save(api_url=...).
+        """
+        return self.base_url
+
+    def url_for(self, doc):
+        return f"{self.base_url}/{paper_route(doc)}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="bench-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a benchmark corpus through the local stand-in API/PDF server.")
+    parser.add_argument("corpus", type=str, help="Corpus directory (from bench_corpus.py).")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765).")
+    parser.add_argument("--delay", type=float, default=0.0, help="Artificial latency per response in seconds.")
+    args = parser.parse_args()
+
+    server = StandInServer(args.corpus, delay_s=args.delay, port=args.port)
+    print(f"Serving {len(server.httpd.manifest)} documents at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
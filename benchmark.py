@@ -0,0 +1,253 @@
+
+import io
+import os
+import re
+import sys
+import json
+import glob
+import time
+import difflib
+import platform
+import tempfile
+import contextlib
+from bench_corpus import generate_corpus, LAYOUTS
+from bench_server import StandInServer
+from run_telemetry import configure_telemetry
+from collect_papers import extract_introduction, search_and_save
+
+# Offline benchmark: synthetic corpus + local stand-in API/PDF server, no network access.
+# Compares the run against a stored baseline and exits non-zero on regression.
+# Accuracy, outcome counts and stage counts are deterministic and always gated; timing and
+# memory only fail the run when the baseline was recorded on the same host (otherwise warn).
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+# A document counts as correctly extracted at or above this similarity to the ground truth
+CORRECT_SCORE = 0.9
+# Relative slack for timing / memory metrics (machine noise), absolute slack for accuracy
+DEFAULT_TOLERANCE = 0.3
+ACCURACY_TOLERANCE = 0.01
+# Latency changes smaller than this (seconds) are never reported as regressions
+MIN_LATENCY_DELTA_S = 0.02
+
+
+def _words(text):
+    return re.sub(r'[^a-z0-9]+', ' ', (text or '').lower()).split()
+
+
+def score_extraction(expected, actual):
+    """
+    Similarity of extracted text to the ground truth (0..1).
+    Documents without a readable Introduction score 1 only if nothing was extracted.
+    """
+    if expected is None:
+        return 1.0 if not actual else 0.0
+    if not actual:
+        return 0.0
+    return difflib.SequenceMatcher(None, _words(expected), _words(actual), autojunk=False).ratio()
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MB (None where unsupported, e.g. Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+@contextlib.contextmanager
+def _quiet(verbose):
+    if verbose:
+        yield
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+
+
+def run_benchmark(corpus_dir, manifest, verbose=False):
+    """
+    Run extraction over the whole corpus, then one end-to-end search_and_save against the stand-in API.
+    Returns the results dict.
+    """
+    telemetry = configure_telemetry()
+    per_layout = {layout: [] for layout in LAYOUTS}
+    scores = []
+    # 403 mirrors never reach extraction: they are covered by the http_403 outcome counts,
+    # not by accuracy or throughput (they would score 1.0 and dilute their layout's average)
+    scored = [doc for doc in manifest if doc["route"] != "forbidden"]
+
+    with StandInServer(corpus_dir, manifest) as server:
+        started = time.perf_counter()
+        for doc in scored:
+            with _quiet(verbose), telemetry.stage("document", layout=doc["layout"], route=doc["route"]):
+                intro = extract_introduction(server.url_for(doc), doc["abstract"])
+            score = score_extraction(doc["expected"], intro)
+            scores.append(score)
+            per_layout[doc["layout"]].append(score)
+        elapsed = time.perf_counter() - started
+        for doc in manifest:
+            if doc["route"] == "forbidden":
+                with _quiet(verbose):
+                    extract_introduction(server.url_for(doc), doc["abstract"])
+        summary = telemetry.summary()
+
+        # End to end: search API -> dedup -> download -> extract -> save (fresh counters)
+        e2e_telemetry = configure_telemetry()
+        with tempfile.TemporaryDirectory() as output_dir:
+            e2e_started = time.perf_counter()
+            with _quiet(verbose):
+                search_and_save("benchmark", limit=len(manifest), output_dir=output_dir, api_url=server.api_url)
+            e2e_elapsed = time.perf_counter() - e2e_started
+            e2e_outcomes = e2e_telemetry.summary()["outcomes"]
+            saved = []
+            for path in glob.glob(os.path.join(output_dir, "*.json")):
+                with open(path, encoding='utf-8') as f:
+                    saved.append(json.load(f))
+
+    # The stand-in server listens on a random port: label its downloads with a stable host name
+    stages = {re.sub(r'host="[^"]*"', 'host="stand-in"', name): {k: stats[k] for k in ("count", "p50_s", "p90_s", "p99_s")}
+              for name, stats in summary["stages"].items()
+              if name.startswith(("parse", "download"))}
+    doc_latencies = sorted(s for key, samples in telemetry.timings.items() if key[0] == "document" for s in samples)
+
+    return {
+        "documents": len(scored),
+        "wall_time_s": round(elapsed, 3),
+        "docs_per_sec": round(len(scored) / elapsed, 2) if elapsed > 0 else None,
+        "document_p50_s": round(doc_latencies[len(doc_latencies) // 2], 4),
+        "document_p90_s": round(doc_latencies[int(len(doc_latencies) * 0.9)], 4),
+        "accuracy": round(sum(scores) / len(scores), 4),
+        "correct_rate": round(sum(1 for s in scores if s >= CORRECT_SCORE) / len(scores), 4),
+        "accuracy_by_layout": {layout: round(sum(v) / len(v), 4) for layout, v in per_layout.items() if v},
+        "regex_fallback_rate": summary["regex_fallback_rate"],
+        "outcomes": summary["outcomes"].get("extract", {}),
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+        "e2e_saved": len(saved),
+        "e2e_wall_time_s": round(e2e_elapsed, 3),
+        "e2e_missing_introduction": sum(1 for p in saved if not p.get("introduction")),
+        "e2e_outcomes": {kind: e2e_outcomes.get(kind, {}) for kind in ("paper", "extract")},
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Return (regressions, warnings) as lists of human readable strings.
+    Timing and memory changes are regressions only if the baseline was recorded on this host.
+    """
+    regressions = []
+    warnings = []
+    host = results.get("config", {}).get("host")
+    timing = regressions if host and baseline.get("config", {}).get("host") == host else warnings
+
+    def higher_is_better(name, new, old, slack, found=regressions):
+        if new is not None and old is not None and new < old - slack:
+            found.append(f"{name}: {new} < baseline {old}")
+
+    def lower_is_better(name, new, old, min_delta=0.0):
+        if new is not None and old is not None and new > old * (1 + tolerance) and new - old > min_delta:
+            timing.append(f"{name}: {new} > baseline {old} (+{tolerance:.0%} allowed)")
+
+    def unchanged(name, new, old):
+        if old is not None and new != old:
+            regressions.append(f"{name}: {new} != baseline {old}")
+
+    higher_is_better("accuracy", results["accuracy"], baseline.get("accuracy"), ACCURACY_TOLERANCE)
+    higher_is_better("correct_rate", results["correct_rate"], baseline.get("correct_rate"), ACCURACY_TOLERANCE)
+    for layout, old in baseline.get("accuracy_by_layout", {}).items():
+        higher_is_better(f"accuracy[{layout}]", results["accuracy_by_layout"].get(layout), old, ACCURACY_TOLERANCE)
+    higher_is_better("e2e_saved", results["e2e_saved"], baseline.get("e2e_saved"), 0)
+
+    # The corpus is deterministic: any change in outcomes or in how often a stage ran is a behaviour change
+    unchanged("outcomes", results["outcomes"], baseline.get("outcomes"))
+    unchanged("e2e_outcomes", results["e2e_outcomes"], baseline.get("e2e_outcomes"))
+    for stage, old in baseline.get("stages", {}).items():
+        unchanged(f"{stage} count", results["stages"].get(stage, {}).get("count"), old["count"])
+
+    if baseline.get("docs_per_sec"):
+        higher_is_better("docs_per_sec", results["docs_per_sec"], baseline["docs_per_sec"],
+                         baseline["docs_per_sec"] * tolerance, found=timing)
+    # Per-stage sample counts are small, so compare medians; tails are covered by document_p90_s
+    for stage, old in baseline.get("stages", {}).items():
+        new = results["stages"].get(stage)
+        if new:
+            lower_is_better(f"{stage} p50_s", new["p50_s"], old["p50_s"], MIN_LATENCY_DELTA_S)
+    lower_is_better("document_p90_s", results["document_p90_s"], baseline.get("document_p90_s"), MIN_LATENCY_DELTA_S)
+    lower_is_better("peak_rss_mb", results["peak_rss_mb"], baseline.get("peak_rss_mb"))
+    return regressions, warnings
+
+
+def print_report(results):
+    print(f"Documents: {results['documents']} in {results['wall_time_s']}s ({results['docs_per_sec']} docs/sec)")
+    print(f"Per document: p50={results['document_p50_s']}s p90={results['document_p90_s']}s")
+    print(f"Accuracy: {results['accuracy']:.3f} (correct >= {CORRECT_SCORE}: {results['correct_rate']:.1%})")
+    for layout, acc in results["accuracy_by_layout"].items():
+        print(f"  {layout:<14} {acc:.3f}")
+    print(f"Regex fallback rate: {results['regex_fallback_rate']}")
+    print(f"Extraction outcomes: {results['outcomes']}")
+    print("Stage latency:")
+    for stage, stats in results["stages"].items():
+        print(f"  {stage:<40} n={stats['count']:<4} p50={stats['p50_s']}s p90={stats['p90_s']}s p99={stats['p99_s']}s")
+    print(f"Peak RSS: {results['peak_rss_mb']} MB")
+    print(f"End to end: saved {results['e2e_saved']} papers in {results['e2e_wall_time_s']}s")
+    print(f"End to end outcomes: {results['e2e_outcomes']}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline extraction benchmark against a synthetic PDF corpus.")
+    parser.add_argument("--docs-per-layout", type=int, default=4, help="Documents generated per layout (default: 4).")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed (default: 0).")
+    parser.add_argument("--corpus-dir", type=str, default=None, help="Keep the generated corpus here (default: temp dir).")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE, help="Baseline JSON to compare against.")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run's results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative slowdown (default: 0.3).")
+    parser.add_argument("--report", type=str, default=None, help="Also write the results JSON here.")
+    parser.add_argument("--verbose", action="store_true", help="Show crawler log output.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_dir = args.corpus_dir or tmp_dir
+        manifest = generate_corpus(corpus_dir, args.docs_per_layout, args.seed)
+        results = run_benchmark(corpus_dir, manifest, verbose=args.verbose)
+    results["config"] = {"docs_per_layout": args.docs_per_layout, "seed": args.seed, "host": platform.node()}
+
+    print_report(results)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+            f.write("\n")
+        print(f"Baseline written to: {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}. Run with --update-baseline to create one.")
+        sys.exit(0)
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    corpus_config = {k: v for k, v in results["config"].items() if k != "host"}
+    if {k: v for k, v in baseline.get("config", {}).items() if k != "host"} != corpus_config:
+        print(f"[WARNING] Baseline was recorded with {baseline.get('config')}; comparison may be meaningless.")
+    regressions, warnings = compare_to_baseline(results, baseline, args.tolerance)
+    if warnings:
+        print(f"Timing differences (advisory, baseline host {baseline.get('config', {}).get('host')!r} "
+              f"is not this host {results['config']['host']!r}):")
+        for w in warnings:
+            print(f"  - {w}")
+    if regressions:
+        print("REGRESSIONS:")
+        for r in regressions:
+            print(f"  - {r}")
+        sys.exit(1)
+    print("No regressions against baseline.")
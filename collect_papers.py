@@ -6,6 +6,7 @@ import requests
 import io
 from semanticscholar import SemanticScholar
 from pypdf import PdfReader
+from run_telemetry import get_telemetry, configure_telemetry
 
 def sanitize_filename(filename):
     """
@@ -14,9 +15,12 @@ def sanitize_filename(filename):
     return re.sub(r'[\\/*?:"<>|]', "", filename)
 
 import datetime
+import time
 
 def log(msg):
     print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+    # Keep the free-text log in the JSON-lines event stream too, for context around metrics
+    get_telemetry().emit("log", msg=msg)
 
 
 
@@ -155,25 +159,32 @@ def extract_introduction(pdf_url, abstract_text=None):
     Download PDF and extract the "Introduction" section.
     Returns the extracted text or None if failed.
     """
+    telemetry = get_telemetry()
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         log(f"Attempting to download PDF from: {pdf_url}")
         
+        start = time.perf_counter()
         try:
             response = requests.get(pdf_url, headers=headers, timeout=15, allow_redirects=True)
+            telemetry.observe_download(pdf_url, len(response.content), time.perf_counter() - start, response.status_code)
             
             if response.status_code == 403:
                 log(f"Access Denied (403) for {pdf_url}. Likely anti-bot protection.")
+                telemetry.outcome("extract", "http_403", url=pdf_url)
                 return None
             elif response.status_code != 200:
                 log(f"Failed to download PDF. Status Code: {response.status_code}")
+                telemetry.outcome("extract", "http_error", url=pdf_url, status=response.status_code)
                 return None
                 
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
+            telemetry.observe_download(pdf_url, 0, time.perf_counter() - start, "error")
             log(f"Network request failed: {e}")
+            telemetry.outcome("extract", "network_error", url=pdf_url)
             return None
         
         content = response.content
@@ -192,201 +203,246 @@ def extract_introduction(pdf_url, abstract_text=None):
                     real_pdf_url = meta_pdf['content']
                     log(f"Found real PDF URL in meta tag: {real_pdf_url}")
                     log(f"Downloading real PDF from: {real_pdf_url}")
+                    telemetry.count("landing_page_total", result="pdf_link")
+                    start = time.perf_counter()
                     response = requests.get(real_pdf_url, headers=headers, timeout=15)
+                    telemetry.observe_download(real_pdf_url, len(response.content), time.perf_counter() - start, response.status_code)
                     response.raise_for_status()
                     content = response.content
                     content_type = response.headers.get('Content-Type', '').lower()
                 else:
                     log("No 'citation_pdf_url' meta tag found in HTML.")
+                    telemetry.count("landing_page_total", result="no_pdf_link")
+                    telemetry.outcome("extract", "no_pdf_link", url=pdf_url)
                     return None
             except ImportError:
                 log("BeautifulSoup not installed. Cannot parse HTML.")
+                telemetry.outcome("extract", "error", url=pdf_url)
                 return None
             except Exception as e:
                 log(f"Failed to parse HTML for PDF link: {e}")
+                telemetry.outcome("extract", "landing_page_error", url=pdf_url)
                 return None
 
         # Final check if we have a PDF
         if 'application/pdf' not in content_type:
             log(f"[WARNING] Final content-type is '{content_type}', not PDF. Skipping extraction.")
+            telemetry.outcome("extract", "not_pdf", url=pdf_url, content_type=content_type)
             return None
 
-        # ---------------------------------------------------------
-        # NEW: Try Font-Aware Extraction First (Robust)
-        # ---------------------------------------------------------
-        log("Attempting Font-Aware Extraction (pdfplumber)...")
+        # Optional profiling hook: captures slow documents (see profile_extraction.py)
+        from profile_extraction import get_profiler
+        profiler = get_profiler()
+        if profiler is not None:
+            return profiler.run(extract_introduction_from_pdf, content, abstract_text, source=pdf_url)
+        return extract_introduction_from_pdf(content, abstract_text, source=pdf_url)
+
+    except Exception as e:
+        print(f"Failed to extract introduction from {pdf_url}: {e}")
+        telemetry.outcome("extract", "error", url=pdf_url, error=type(e).__name__)
+        return None
+
+def extract_introduction_from_pdf(content, abstract_text=None, source=None):
+    """
+    Extract the "Introduction" section from already downloaded PDF bytes.
+    `source` is only used to label telemetry events (usually the PDF URL).
+    Returns the extracted text or None if failed.
+    """
+    telemetry = get_telemetry()
+    telemetry.count("parse_attempts_total")
+    # ---------------------------------------------------------
+    # NEW: Try Font-Aware Extraction First (Robust)
+    # ---------------------------------------------------------
+    log("Attempting Font-Aware Extraction (pdfplumber)...")
+    with telemetry.stage("parse", strategy="font_aware"):
         font_intro = extract_introduction_font_aware(content)
-        if font_intro and len(font_intro) > 50: # Sanity check
-            log("Font-Aware Extraction Successful!")
-            return font_intro
-        
-        log("Font-Aware Extraction failed or empty. Falling back to Regex...")
-        # ---------------------------------------------------------
-        
-        with io.BytesIO(content) as f:
-            reader = PdfReader(f)
-            text = ""
-            # Read first few pages (usually Introduction is in the first few pages)
-            max_pages = min(len(reader.pages), 5)
-            for i in range(max_pages):
-                text += reader.pages[i].extract_text()
-        
-        # ... [Rest of the Regex Logic remains as fallback] ...
+    if font_intro and len(font_intro) > 50: # Sanity check
+        log("Font-Aware Extraction Successful!")
+        return _extraction_succeeded(telemetry, "font_aware", source, font_intro)
+    
+    log("Font-Aware Extraction failed or empty. Falling back to Regex...")
+    telemetry.count("regex_fallback_total")
+    # ---------------------------------------------------------
+    
+    with telemetry.stage("parse", strategy="pypdf_text"), io.BytesIO(content) as f:
+        reader = PdfReader(f)
+        text = ""
+        # Read first few pages (usually Introduction is in the first few pages)
+        max_pages = min(len(reader.pages), 5)
+        for i in range(max_pages):
+            text += reader.pages[i].extract_text()
+    
+    with telemetry.stage("parse", strategy="regex"):
+        strategy, intro = _extract_introduction_regex(text, abstract_text)
+    # Empty text is a failure, same as before telemetry (search_and_save skips falsy results)
+    if intro:
+        return _extraction_succeeded(telemetry, strategy, source, intro)
+    telemetry.outcome("extract", "no_introduction", url=source, strategy=strategy)
+    return None
+
+def _extraction_succeeded(telemetry, strategy, pdf_url, intro):
+    telemetry.count("extract_strategy_total", strategy=strategy)
+    telemetry.outcome("extract", "success", url=pdf_url, strategy=strategy, chars=len(intro))
+    return intro
+
+def _extract_introduction_regex(text, abstract_text=None):
+    """
+    Regex fallback strategies over plain pypdf text.
+    Returns (strategy_name, text), or (None, None) if nothing matched.
+    """
+    # Define Stop Patterns for next sections
+    # REFINED: Removed generic "2." to avoid matching list items (e.g. "2. Occurrences").
+    # Now matches optional numbering (1., 2, I., II) followed by specific section titles.
+    section_titles = [
+        r'Literature Review',
+        r'Related Work',
+        r'Background',
+        r'Preliminaries',
+        r'Methodology',
+        r'Method',
+        r'The Proposed Method',
+        r'System Model',
+        r'Problem Formulation',
+        r'Problem Statement',
+        r'Significance of the study',
+        r'Experimental Setup',
+        r'Experiments',
+        r'Results',
+        r'Conclusion'
+    ]
+    titles_patt = "|".join(section_titles)
+    # Pattern: \n \s* (?: (?: \d+\.? | [IVX]+\.? ) \s* )? (?: Title1 | ... ) \s* \n
+    # Enforce that the title is the whole line (or ends the line) to avoid matching words in sentences.
+    # Also add a generic stop for Roman Numerals (II. - X.) which are strong indicators of sections.
+    
+    specific_titles_patt = r'(?:(?:\d+\.?|[IVX]+\.?)\s*)?(?:' + titles_patt + r')\s*\n'
+    roman_header_patt = r'(?:II|III|IV|V|VI|VII|VIII|IX|X)\.\s'
+    
+    stop_patterns = r'(?:' + specific_titles_patt + r'|' + roman_header_patt + r')'
+
+    # Strategy 1: Standard Regex (Looking for "Introduction" header)
+    # We changed stop_patterns to include the newline (in specific_titles_patt), so we adjust the lookahead key
+    # REFINED: Added support for "I." (Roman numeral) prefix and "Executive Summary"
+    match = re.search(r'(?i)\n\s*(?:(?:1\.|I\.)\s*)?(?:Introduction|Executive Summary).*?\n(.*?)(?:\n\s*' + stop_patterns + r')', text, re.DOTALL)
+    if match:
+         return "regex_standard", match.group(1).strip()
+
+    # Strategy 2: Use Abstract to locate Introduction (Fallback)
+    if abstract_text:
+        log("Standard Regex failed. Attempting to use Abstract to locate Introduction...")
+        # Normalize strings to improve matching (ignore whitespace differences)
+        normalized_text = re.sub(r'\s+', ' ', text).lower()
         
-        # Define Stop Patterns for next sections
-        # REFINED: Removed generic "2." to avoid matching list items (e.g. "2. Occurrences").
-        # Now matches optional numbering (1., 2, I., II) followed by specific section titles.
-        section_titles = [
-            r'Literature Review',
-            r'Related Work',
-            r'Background',
-            r'Preliminaries',
-            r'Methodology',
-            r'Method',
-            r'The Proposed Method',
-            r'System Model',
-            r'Problem Formulation',
-            r'Problem Statement',
-            r'Significance of the study',
-            r'Experimental Setup',
-            r'Experiments',
-            r'Results',
-            r'Conclusion'
-        ]
-        titles_patt = "|".join(section_titles)
-        # Pattern: \n \s* (?: (?: \d+\.? | [IVX]+\.? ) \s* )? (?: Title1 | ... ) \s* \n
-        # Enforce that the title is the whole line (or ends the line) to avoid matching words in sentences.
-        # Also add a generic stop for Roman Numerals (II. - X.) which are strong indicators of sections.
+        # Use the last 50 chars of the abstract to find its end position
+        # This is more robust than matching the whole abstract
+        abstract_chunk = abstract_text.strip()
+        if len(abstract_chunk) > 50:
+            abstract_chunk = abstract_chunk[-50:]
+        normalized_chunk = re.sub(r'\s+', ' ', abstract_chunk).lower()
         
-        specific_titles_patt = r'(?:(?:\d+\.?|[IVX]+\.?)\s*)?(?:' + titles_patt + r')\s*\n'
-        roman_header_patt = r'(?:II|III|IV|V|VI|VII|VIII|IX|X)\.\s'
+        idx = normalized_text.find(normalized_chunk)
         
-        stop_patterns = r'(?:' + specific_titles_patt + r'|' + roman_header_patt + r')'
-
-        # Strategy 1: Standard Regex (Looking for "Introduction" header)
-        # We changed stop_patterns to include the newline (in specific_titles_patt), so we adjust the lookahead key
-        # REFINED: Added support for "I." (Roman numeral) prefix and "Executive Summary"
-        match = re.search(r'(?i)\n\s*(?:(?:1\.|I\.)\s*)?(?:Introduction|Executive Summary).*?\n(.*?)(?:\n\s*' + stop_patterns + r')', text, re.DOTALL)
-        if match:
-             return match.group(1).strip()
-
-        # Strategy 2: Use Abstract to locate Introduction (Fallback)
-        if abstract_text:
-            log("Standard Regex failed. Attempting to use Abstract to locate Introduction...")
-            # Normalize strings to improve matching (ignore whitespace differences)
-            normalized_text = re.sub(r'\s+', ' ', text).lower()
-            
-            # Use the last 50 chars of the abstract to find its end position
-            # This is more robust than matching the whole abstract
-            abstract_chunk = abstract_text.strip()
-            if len(abstract_chunk) > 50:
-                abstract_chunk = abstract_chunk[-50:]
-            normalized_chunk = re.sub(r'\s+', ' ', abstract_chunk).lower()
-            
-            idx = normalized_text.find(normalized_chunk)
+        if idx == -1:
+             # Try even smaller chunk?
+             abstract_chunk = abstract_text.strip().split()[-5:] # Last 5 words
+             abstract_chunk = " ".join(abstract_chunk)
+             normalized_chunk = re.sub(r'\s+', ' ', abstract_chunk).lower()
+             idx = normalized_text.find(normalized_chunk)
+             if idx != -1:
+                 log("Found Abstract end using last 5 words.")
+
+        if idx != -1:
+            # Approximate position in original text? 
+            # Since we normalized, indices don't match. 
+            # We need to find this chunk in the original text.
+            # Construct a flexible regex from the chunk
+            words = abstract_chunk.split()
+            # Escape and allow whitespace between words
+            pattern = r'\s*'.join([re.escape(w) for w in words])
             
-            if idx == -1:
-                 # Try even smaller chunk?
-                 abstract_chunk = abstract_text.strip().split()[-5:] # Last 5 words
-                 abstract_chunk = " ".join(abstract_chunk)
-                 normalized_chunk = re.sub(r'\s+', ' ', abstract_chunk).lower()
-                 idx = normalized_text.find(normalized_chunk)
-                 if idx != -1:
-                     log("Found Abstract end using last 5 words.")
-
-            if idx != -1:
-                # Approximate position in original text? 
-                # Since we normalized, indices don't match. 
-                # We need to find this chunk in the original text.
-                # Construct a flexible regex from the chunk
-                words = abstract_chunk.split()
-                # Escape and allow whitespace between words
-                pattern = r'\s*'.join([re.escape(w) for w in words])
+            search_match = re.search(pattern, text, re.IGNORECASE)
+            if search_match:
+                log("Found Abstract end in PDF.")
+                post_abstract_text = text[search_match.end():]
                 
-                search_match = re.search(pattern, text, re.IGNORECASE)
-                if search_match:
-                    log("Found Abstract end in PDF.")
-                    post_abstract_text = text[search_match.end():]
-                    
-                    # Define Stop Patterns again for this scope
-                    section_titles = [
-                        r'Literature Review',
-                        r'Related Work',
-                        r'Background',
-                        r'Preliminaries',
-                        r'Methodology',
-                        r'Method',
-                        r'The Proposed Method',
-                        r'System Model',
-                        r'Problem Formulation',
-                        r'Problem Statement',
-                        r'Significance of the study',
-                        r'Experimental Setup',
-                        r'Experiments',
-                        r'Results',
-                        r'Conclusion',
-                        r'Model'
-                    ]
-                    titles_patt = "|".join(section_titles)
-                    # Enforce end-of-line match
-                    specific_titles_patt = r'(?:(?:\d+\.?|[IVX]+\.?)\s*)?(?:' + titles_patt + r')\s*\n'
-                    roman_header_patt = r'(?:II|III|IV|V|VI|VII|VIII|IX|X)\.\s'
-                    
-                    stop_patterns = r'(?:' + specific_titles_patt + r'|' + roman_header_patt + r')'
+                # Define Stop Patterns again for this scope
+                section_titles = [
+                    r'Literature Review',
+                    r'Related Work',
+                    r'Background',
+                    r'Preliminaries',
+                    r'Methodology',
+                    r'Method',
+                    r'The Proposed Method',
+                    r'System Model',
+                    r'Problem Formulation',
+                    r'Problem Statement',
+                    r'Significance of the study',
+                    r'Experimental Setup',
+                    r'Experiments',
+                    r'Results',
+                    r'Conclusion',
+                    r'Model'
+                ]
+                titles_patt = "|".join(section_titles)
+                # Enforce end-of-line match
+                specific_titles_patt = r'(?:(?:\d+\.?|[IVX]+\.?)\s*)?(?:' + titles_patt + r')\s*\n'
+                roman_header_patt = r'(?:II|III|IV|V|VI|VII|VIII|IX|X)\.\s'
+                
+                stop_patterns = r'(?:' + specific_titles_patt + r'|' + roman_header_patt + r')'
 
-                    # Search for standard OR spaced-out Introduction header
-                    # "1. Introduction" or "1 I NTRODUCTION" or just "Introduction" or "I. Introduction"
-                    # Also support "Executive Summary" as it often replaces Introduction in reports.
-                    intro_header_pattern = r'(?:(?:1\.|I\.)\s*)?(?:I\s*N\s*T\s*R\s*O\s*D\s*U\s*C\s*T\s*I\s*O\s*N|Introduction|Executive Summary)'
-                    
-                    # Update regex to use new stop_patterns format
-                    intro_match = re.search(r'(?i)\n\s*' + intro_header_pattern + r'.*?\n(.*?)(?:\n\s*' + stop_patterns + r')', post_abstract_text, re.DOTALL)
-                    if intro_match:
-                        return intro_match.group(1).strip()
+                # Search for standard OR spaced-out Introduction header
+                # "1. Introduction" or "1 I NTRODUCTION" or just "Introduction" or "I. Introduction"
+                # Also support "Executive Summary" as it often replaces Introduction in reports.
+                intro_header_pattern = r'(?:(?:1\.|I\.)\s*)?(?:I\s*N\s*T\s*R\s*O\s*D\s*U\s*C\s*T\s*I\s*O\s*N|Introduction|Executive Summary)'
+                
+                # Update regex to use new stop_patterns format
+                intro_match = re.search(r'(?i)\n\s*' + intro_header_pattern + r'.*?\n(.*?)(?:\n\s*' + stop_patterns + r')', post_abstract_text, re.DOTALL)
+                if intro_match:
+                    return "abstract_anchor", intro_match.group(1).strip()
+                
+                # Fallback: Just take everything up to the next section if header wasn't matched cleanly
+                # but we must be careful not to grab "Keywords" or metadata lines.
+                # Let's try to just find the START of the next section and take everything before it.
+                next_section_match = re.search(r'(?i)(\n\s*' + stop_patterns + r')', post_abstract_text, re.DOTALL)
+                if next_section_match:
+                    # We have the end. Now where does it start? 
+                    # Ideally after "Keywords" or just after the title/etc.
+                    # Since we strictly started AFTER the abstract, the content is "between abstract and section 2".
+                    # This INCLUDES the Introduction header line usually.
+                    raw_content = post_abstract_text[:next_section_match.start()].strip()
                     
-                    # Fallback: Just take everything up to the next section if header wasn't matched cleanly
-                    # but we must be careful not to grab "Keywords" or metadata lines.
-                    # Let's try to just find the START of the next section and take everything before it.
-                    next_section_match = re.search(r'(?i)(\n\s*' + stop_patterns + r')', post_abstract_text, re.DOTALL)
-                    if next_section_match:
-                        # We have the end. Now where does it start? 
-                        # Ideally after "Keywords" or just after the title/etc.
-                        # Since we strictly started AFTER the abstract, the content is "between abstract and section 2".
-                        # This INCLUDES the Introduction header line usually.
-                        raw_content = post_abstract_text[:next_section_match.start()].strip()
-                        
-                        # Clean up "Keywords: ..." lines or similar junk at the start
-                        # Also remove the "1. Introduction" line if it exists in the content
-                        # Remove lines starting with "Keywords"
-                        raw_content = re.sub(r'(?i)^keywords.*?\n', '', raw_content, flags=re.MULTILINE)
-                        # Remove "1. Introduction" type headers if present at random places (unlikely if we missed it)
-                        return raw_content.strip()
-
-        # Fallback 3: Return text starting from "Introduction" (Truncation fallback)
-        # Add support for Spaced Header here too
-        match_start = re.search(r'(?i)\n\s*(?:1\.?)?\s*(?:I\s*N\s*T\s*R\s*O\s*D\s*U\s*C\s*T\s*I\s*O\s*N|Introduction|Executive Summary).*?\n', text)
-        if match_start:
-            return text[match_start.end():].strip()
-            
-        return None
+                    # Clean up "Keywords: ..." lines or similar junk at the start
+                    # Also remove the "1. Introduction" line if it exists in the content
+                    # Remove lines starting with "Keywords"
+                    raw_content = re.sub(r'(?i)^keywords.*?\n', '', raw_content, flags=re.MULTILINE)
+                    # Remove "1. Introduction" type headers if present at random places (unlikely if we missed it)
+                    return "abstract_section", raw_content.strip()
 
-    except Exception as e:
-        print(f"Failed to extract introduction from {pdf_url}: {e}")
-        return None
+    # Fallback 3: Return text starting from "Introduction" (Truncation fallback)
+    # Add support for Spaced Header here too
+    match_start = re.search(r'(?i)\n\s*(?:1\.?)?\s*(?:I\s*N\s*T\s*R\s*O\s*D\s*U\s*C\s*T\s*I\s*O\s*N|Introduction|Executive Summary).*?\n', text)
+    if match_start:
+        return "truncation", text[match_start.end():].strip()
+        
+    return None, None
 
-def search_and_save(keyword, limit=5, output_dir='results'):
+def search_and_save(keyword, limit=5, output_dir='results', api_url=None):
     """
     Search for papers by keyword and save them as JSON files.
     Only saves papers with open access PDFs.
+    `api_url` overrides the Semantic Scholar API base URL (e.g. the local stand-in in bench_server.py).
     """
-    sch = SemanticScholar(timeout=30)
+    sch = SemanticScholar(timeout=30, api_url=api_url)
+    telemetry = get_telemetry()
     log(f"Searching for papers with keyword: '{keyword}'...")
     
     try:
         # We process indefinite results until we hit the user's limit of SAVED papers.
         # We set the API batch limit to 100 (max allowed) for efficiency.
         log(f"Querying Semantic Scholar API (fetching batches of 100)...")
-        results = sch.search_paper(keyword, limit=100, fields=['title', 'abstract', 'url', 'openAccessPdf', 'externalIds'])
+        with telemetry.stage("search"):
+            results = sch.search_paper(keyword, limit=100, fields=['paperId', 'title', 'abstract', 'url', 'openAccessPdf', 'externalIds'])
         log(f"API returned results object. Iterating...")
         
         if not results:
@@ -399,71 +455,129 @@ def search_and_save(keyword, limit=5, output_dir='results'):
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
+        # Deduplicate each API batch BEFORE downloading anything.
+        # Preprint/published versions are merged so only the best PDF source is fetched once.
+        from dedup_papers import PaperDeduplicator, dedupe_papers, best_pdf_url
+        deduplicator = PaperDeduplicator()
+
+        def batches(results, size=100):
+            batch = []
+            # Time spent pulling a batch out of `results` is API pagination
+            start = time.perf_counter()
+            for i, paper in enumerate(results):
+                # Inform user if we are crossing a batch boundary (likely fetching next page)
+                if i > 0 and i % size == 0:
+                    log(f"Processed {i} candidates. Fetching next batch if needed...")
+                batch.append(paper)
+                if len(batch) == size:
+                    telemetry.observe("search_page", time.perf_counter() - start)
+                    yield batch
+                    batch = []
+                    start = time.perf_counter()
+            if batch:
+                telemetry.observe("search_page", time.perf_counter() - start)
+                yield batch
+
         # Iterate through the paginated results
-        for i, paper in enumerate(results):
-            # Inform user if we are crossing a batch boundary (likely fetching next page)
-            if i > 0 and i % 100 == 0:
-                log(f"Processed {i} candidates. Fetching next batch if needed...")
+        candidate_count = 0
+        for batch in batches(results):
+            telemetry.count("candidates_total", len(batch))
+            duplicates_before = deduplicator.duplicates_found
+            with telemetry.stage("dedup"):
+                records = dedupe_papers(batch, deduplicator)
+            # Not len(batch) - len(records): earlier unprocessed records can be returned again
+            telemetry.count("duplicates_total", deduplicator.duplicates_found - duplicates_before)
+            log(f"Batch of {len(batch)} candidates -> {len(records)} unique papers after deduplication.")
 
-            if saved_count >= limit:
-                log(f"Reached limit of {limit} saved papers.")
-                break
+            for record in records:
+                candidate_count += 1
+                if saved_count >= limit:
+                    break
 
-            pdf_url = None
-            
-            # log(f"Processing candidate {i+1}: {paper.title}") # Too verbose for large lists?
-            
-            # Priority 1: ArXiv
-            if paper.externalIds and 'ArXiv' in paper.externalIds:
-                arxiv_id = paper.externalIds['ArXiv']
-                pdf_url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
-            
-            # Priority 2: OpenAccessPDF
-            elif paper.openAccessPdf and paper.openAccessPdf.get('url'):
-                pdf_url = paper.openAccessPdf['url']
-            
-            if not pdf_url:
-                # log(f"Skipping '{paper.title}': No PDF available.")
-                continue
+                # Priority 1: ArXiv, Priority 2: OpenAccessPDF (across all merged versions)
+                pdf_url = best_pdf_url(record)
+                
+                if not pdf_url:
+                    # log(f"Skipping '{record['title']}': No PDF available.")
+                    # Left unprocessed: a later version of this paper may still bring a PDF.
+                    telemetry.outcome("paper", "no_pdf")
+                    continue
 
-            log(f"Processing candidate {i+1} (Saved: {saved_count}): {paper.title}")
-            log(f"PDF URL: {pdf_url}")
+                # Mark before downloading so later versions of this paper are never fetched again
+                record['processed'] = True
 
-            abstract_text = paper.abstract
-            # Extract Introduction
-            log("Starting Introduction extraction...")
-            introduction = extract_introduction(pdf_url, abstract_text)
-            
-            if not introduction:
-                log(f"Skipping save: Introduction empty/failed for '{paper.title}'")
-                continue # Skip saving if no introduction
-
-            paper_data = {
-                "title": paper.title,
-                "keyword": keyword,
-                "abstract": abstract_text,
-                "pdf_link": pdf_url, 
-                "introduction": introduction # REFACTOR: Renamed from 'introduce'
-            }
-            
-            # Create a valid filename from the title
-            filename = sanitize_filename(paper.title)
-            # Truncate filename if too long
-            if len(filename) > 100:
-                filename = filename[:100]
+                paper_start = time.perf_counter()
+
+                log(f"Processing candidate {candidate_count} (Saved: {saved_count}): {record['title']}")
+                if len(record['paperIds']) > 1:
+                    log(f"Merged {len(record['paperIds'])} versions: {record['paperIds']}")
+                log(f"PDF URL: {pdf_url}")
+
+                abstract_text = record['abstract']
+                # Extract Introduction
+                log("Starting Introduction extraction...")
+                introduction = extract_introduction(pdf_url, abstract_text)
                 
-            filepath = os.path.join(output_dir, f"{filename}.json")
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(paper_data, f, ensure_ascii=False, indent=4)
-            
-            log(f"Saved: {filepath}")
-            saved_count += 1
+                if not introduction:
+                    log(f"Skipping save: Introduction empty/failed for '{record['title']}'")
+                    telemetry.observe("paper", time.perf_counter() - paper_start)
+                    telemetry.outcome("paper", "extract_failed", title=record['title'])
+                    continue # Skip saving if no introduction
+
+                paper_data = {
+                    "title": record['title'],
+                    "keyword": keyword,
+                    "abstract": abstract_text,
+                    "pdf_link": pdf_url, 
+                    "introduction": introduction # REFACTOR: Renamed from 'introduce'
+                }
+                
+                # Create a valid filename from the title
+                filename = sanitize_filename(record['title'])
+                # Truncate filename if too long
+                if len(filename) > 100:
+                    filename = filename[:100]
+                    
+                filepath = os.path.join(output_dir, f"{filename}.json")
+                
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    json.dump(paper_data, f, ensure_ascii=False, indent=4)
+                
+                log(f"Saved: {filepath}")
+                saved_count += 1
+                telemetry.observe("paper", time.perf_counter() - paper_start)
+                telemetry.outcome("paper", "saved", title=record['title'])
+
+            if saved_count >= limit:
+                log(f"Reached limit of {limit} saved papers.")
+                break
             
+        if deduplicator.duplicates_found:
+            log(f"Deduplication merged {deduplicator.duplicates_found} duplicate records.")
         log(f"Finished. Saved {saved_count} papers.")
 
     except Exception as e:
         log(f"An error occurred: {e}")
+        telemetry.outcome("run", "error", error=type(e).__name__)
+
+    finally:
+        # Also reached by the early return when the search finds nothing
+        log_telemetry_summary(telemetry)
+
+def log_telemetry_summary(telemetry):
+    """
+    Print the end-of-run metrics summary in a human readable form.
+    """
+    summary = telemetry.summary()
+    log(f"Run summary ({summary['wall_time_s']}s wall time):")
+    for stage, stats in summary['stages'].items():
+        log(f"  {stage}: n={stats['count']} total={stats['total_s']}s p50={stats['p50_s']}s p90={stats['p90_s']}s max={stats['max_s']}s")
+    for host, stats in summary['hosts'].items():
+        log(f"  host {host}: {stats['bytes']} bytes in {stats['seconds']}s")
+    for stage, outcomes in summary['outcomes'].items():
+        log(f"  {stage} outcomes: {outcomes}")
+    if summary['regex_fallback_rate'] is not None:
+        log(f"  Regex fallback rate: {summary['regex_fallback_rate']:.1%} of {summary['parse_attempts']} parsed documents")
 
 if __name__ == "__main__":
     import argparse
@@ -472,6 +586,11 @@ if __name__ == "__main__":
     parser.add_argument("keyword", type=str, nargs='?', help="Keyword to search for.")
     parser.add_argument("--limit", type=int, default=100, help="Number of papers to save (default: 10).")
     parser.add_argument("--output", type=str, default="gpt-2", help="Output directory for JSON files (default: 'results').")
+    parser.add_argument("--events", type=str, default=None, help="Append structured JSON-lines telemetry events to this file.")
+    parser.add_argument("--prom", type=str, default=None, help="Write Prometheus textfile metrics here at the end of the run.")
+    parser.add_argument("--profile-dir", type=str, default=None, help="Profile extraction and save slow documents (PDF + profile) here.")
+    parser.add_argument("--profile-threshold", type=float, default=10.0, help="Seconds of extraction time before a document is saved, measured with the profiler running, so it includes profiler overhead (default: 10).")
+    parser.add_argument("--profile-mode", type=str, choices=['cprofile', 'sample'], default='sample', help="Profiler used with --profile-dir. 'sample' has low overhead; 'cprofile' is exact but slows parsing, so more documents cross the threshold (default: sample).")
     
     args = parser.parse_args()
     
@@ -479,7 +598,17 @@ if __name__ == "__main__":
     if not keyword:
         keyword = input("Enter keyword to search: ")
     
+    telemetry = configure_telemetry(events_path=args.events)
+    if args.profile_dir:
+        from profile_extraction import configure_profiling
+        configure_profiling(args.profile_dir, threshold_s=args.profile_threshold, mode=args.profile_mode)
+    
     if keyword:
         search_and_save(keyword, limit=args.limit, output_dir=args.output)
+        if args.prom:
+            telemetry.write_prometheus(args.prom)
+            log(f"Prometheus metrics written to: {args.prom}")
     else:
         log("No keyword provided. Exiting.")
+    
+    telemetry.close()
@@ -0,0 +1,311 @@
+
+import re
+import hashlib
+import unicodedata
+from collections import defaultdict
+from collect_papers import log
+
+# External ID types that identify the same work across Semantic Scholar records.
+# (CorpusId is deliberately excluded: it is per-record, just like paperId.)
+ID_TYPES = ['DOI', 'ArXiv', 'PubMed', 'PubMedCentral', 'ACL', 'MAG', 'DBLP']
+
+# arXiv registers a DOI for every preprint: 10.48550/arXiv.<id>
+ARXIV_DOI_PREFIX = '10.48550/arxiv.'
+
+# MinHash / LSH parameters.
+# 16 bands x 4 rows: pairs with Jaccard >= ~0.5 become candidates,
+# which are then confirmed against ABSTRACT_SIMILARITY_THRESHOLD.
+NUM_PERM = 64
+LSH_BANDS = 16
+SHINGLE_SIZE = 3
+ABSTRACT_SIMILARITY_THRESHOLD = 0.8
+MIN_ABSTRACT_WORDS = 20 # Short abstracts give unreliable similarity estimates
+
+_HASH_BITS = 64
+
+
+def normalize_doi(doi):
+    """
+    Lowercase a DOI and strip any resolver prefix ("https://doi.org/...").
+    """
+    doi = doi.strip().lower()
+    doi = re.sub(r'^(?:https?://)?(?:dx\.)?doi\.org/', '', doi)
+    return re.sub(r'^doi:\s*', '', doi)
+
+
+def normalize_arxiv_id(arxiv_id):
+    """
+    Lowercase an arXiv ID and strip its version suffix (2101.00001v3 -> 2101.00001).
+    """
+    arxiv_id = arxiv_id.strip().lower()
+    arxiv_id = re.sub(r'^arxiv:', '', arxiv_id)
+    return re.sub(r'v\d+$', '', arxiv_id)
+
+
+def normalize_title(title):
+    """
+    Normalize a title for exact matching: strip accents, punctuation, case and spacing.
+    """
+    if not title:
+        return ''
+    title = unicodedata.normalize('NFKD', title)
+    title = ''.join(c for c in title if not unicodedata.combining(c))
+    title = re.sub(r'[^0-9a-z]+', ' ', title.lower())
+    return title.strip()
+
+
+def identity_keys(record):
+    """
+    Return the set of keys that identify this record as a specific work.
+    Two records sharing any key are considered the same paper, except that a shared title
+    is ignored when both records carry different publisher DOIs.
+    """
+    keys = {('paperId', paper_id) for paper_id in record['paperIds'] if paper_id}
+    for id_type, value in record['externalIds'].items():
+        if id_type not in ID_TYPES or not value:
+            continue
+        value = str(value)
+        if id_type == 'DOI':
+            doi = normalize_doi(value)
+            # Preprint DOI -> treat as the arXiv ID so it matches the published record
+            if doi.startswith(ARXIV_DOI_PREFIX):
+                keys.add(('ArXiv', normalize_arxiv_id(doi[len(ARXIV_DOI_PREFIX):])))
+            else:
+                keys.add(('DOI', doi))
+        elif id_type == 'ArXiv':
+            keys.add(('ArXiv', normalize_arxiv_id(value)))
+        else:
+            keys.add((id_type, value.strip().lower()))
+
+    title = normalize_title(record['title'])
+    # Very short titles ("Introduction", "Editorial") collide across unrelated works
+    if len(title.split()) >= 3:
+        keys.add(('title', title))
+    return keys
+
+
+def publisher_doi(record):
+    """
+    Return the record's normalized DOI unless it is missing or an arXiv preprint DOI.
+    """
+    doi = record['externalIds'].get('DOI')
+    if not doi:
+        return None
+    doi = normalize_doi(str(doi))
+    return None if doi.startswith(ARXIV_DOI_PREFIX) else doi
+
+
+def paper_to_record(paper):
+    """
+    Convert a Semantic Scholar Paper object into a plain, mergeable record.
+    """
+    open_access = getattr(paper, 'openAccessPdf', None) or {}
+    pdf_urls = [open_access['url']] if open_access.get('url') else []
+    return {
+        "paperId": getattr(paper, 'paperId', None),
+        "title": getattr(paper, 'title', None) or '',
+        "abstract": getattr(paper, 'abstract', None),
+        "externalIds": dict(getattr(paper, 'externalIds', None) or {}),
+        "openAccessPdfUrls": pdf_urls,
+        "paperIds": [getattr(paper, 'paperId', None)],
+    }
+
+
+def best_pdf_url(record):
+    """
+    Choose the single PDF source to download for a (possibly merged) record.
+    Priority 1: ArXiv (reliable direct PDF). Priority 2: first OpenAccessPDF URL.
+    """
+    arxiv_id = record['externalIds'].get('ArXiv')
+    if arxiv_id:
+        return f"https://arxiv.org/pdf/{arxiv_id}.pdf"
+    if record['openAccessPdfUrls']:
+        return record['openAccessPdfUrls'][0]
+    return None
+
+
+def merge_records(target, other):
+    """
+    Merge `other` into `target` in place, keeping the richest metadata of both.
+    """
+    for id_type, value in other['externalIds'].items():
+        if value and not target['externalIds'].get(id_type):
+            target['externalIds'][id_type] = value
+    for url in other['openAccessPdfUrls']:
+        if url not in target['openAccessPdfUrls']:
+            target['openAccessPdfUrls'].append(url)
+    for paper_id in other['paperIds']:
+        if paper_id not in target['paperIds']:
+            target['paperIds'].append(paper_id)
+    # Keep the longer abstract (published versions are sometimes truncated, sometimes missing)
+    if len(other['abstract'] or '') > len(target['abstract'] or ''):
+        target['abstract'] = other['abstract']
+    if not target['title']:
+        target['title'] = other['title']
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles, using one-permutation hashing:
+    each shingle is hashed once (64-bit) and only competes for the minimum of its own bin,
+    so the cost is O(shingles) instead of O(shingles x permutations).
+    Empty bins are filled from the next non-empty bin (rotation densification).
+    """
+    def __init__(self, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.salt = seed.to_bytes(8, 'little')
+
+    def shingles(self, text):
+        words = normalize_title(text).split()
+        if len(words) < self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text):
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        num_bins = self.num_perm
+        bins = [None] * num_bins
+        for s in shingles:
+            h = int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8, salt=self.salt).digest(), 'little')
+            idx, value = h % num_bins, h // num_bins
+            if bins[idx] is None or value < bins[idx]:
+                bins[idx] = value
+        # Densify: an empty bin borrows the value of the next non-empty bin, tagged with
+        # the distance so borrowed values only collide with identically borrowed ones.
+        sig = list(bins)
+        for i in range(num_bins):
+            if bins[i] is None:
+                for dist in range(1, num_bins):
+                    value = bins[(i + dist) % num_bins]
+                    if value is not None:
+                        sig[i] = value + (dist << _HASH_BITS)
+                        break
+        return tuple(sig)
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        """
+        Estimated Jaccard similarity of the two shingle sets.
+        """
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class PaperDeduplicator:
+    """
+    Incremental duplicate detection for search results.
+
+    Records are matched by shared identity keys (DOI / arXiv / other external IDs,
+    normalized title) and, failing that, by MinHash/LSH similarity of abstracts.
+    Title and abstract matches are rejected when both records have different publisher DOIs.
+    Matched records are merged into the first-seen record.
+    """
+    def __init__(self, threshold=ABSTRACT_SIMILARITY_THRESHOLD, num_perm=NUM_PERM, bands=LSH_BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.records = []
+        self._key_index = {}
+        self._buckets = defaultdict(list)
+        self._signatures = defaultdict(list)
+        self.duplicates_found = 0
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _find_matches(self, record, keys, signature):
+        matches = {self._key_index[key] for key in keys if key in self._key_index and key[0] != 'title'}
+        # Title and abstract matches are only evidence, not identity
+        similar = {self._key_index[key] for key in keys if key in self._key_index and key[0] == 'title'}
+        if signature is not None:
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates.update(self._buckets.get(band_key, ()))
+            for idx in candidates - matches - similar:
+                if any(MinHasher.similarity(signature, sig) >= self.threshold for sig in self._signatures[idx]):
+                    similar.add(idx)
+        # Follow merges so we always point at the surviving record
+        matches = {self._resolve(idx) for idx in matches}
+        doi = publisher_doi(record)
+        for idx in {self._resolve(idx) for idx in similar}:
+            # Generic titles ("Deep Learning for Medical Image Analysis") are shared by
+            # distinct papers: two different publisher DOIs always mean two works.
+            other_doi = publisher_doi(self.records[idx])
+            if doi and other_doi and doi != other_doi:
+                continue
+            matches.add(idx)
+        return matches
+
+    def _resolve(self, idx):
+        while 'duplicate_of' in self.records[idx]:
+            idx = self.records[idx]['duplicate_of']
+        return idx
+
+    def _index(self, idx, keys, signature):
+        for key in keys:
+            self._key_index.setdefault(key, idx)
+        if signature is not None:
+            self._signatures[idx].append(signature)
+            for band_key in self._band_keys(signature):
+                self._buckets[band_key].append(idx)
+
+    def _abstract_signature(self, record):
+        abstract = record['abstract']
+        if not abstract or len(abstract.split()) < MIN_ABSTRACT_WORDS:
+            return None
+        return self.hasher.signature(abstract)
+
+    def add(self, record):
+        """
+        Add a record. Returns (canonical_record, is_new).
+        If the record duplicates one already seen, it is merged into that record
+        and the existing record is returned with is_new=False.
+        """
+        keys = identity_keys(record)
+        signature = self._abstract_signature(record)
+        matches = self._find_matches(record, keys, signature)
+
+        if not matches:
+            idx = len(self.records)
+            self.records.append(record)
+            self._index(idx, keys, signature)
+            return record, True
+
+        self.duplicates_found += 1
+        target_idx = min(matches)
+        target = self.records[target_idx]
+        merge_records(target, record)
+        # The new record bridged several earlier ones: fold them all into the oldest
+        for idx in sorted(matches - {target_idx}):
+            merge_records(target, self.records[idx])
+            self.records[idx]['duplicate_of'] = target_idx
+            if self.records[idx].get('processed'):
+                target['processed'] = True
+        self._index(target_idx, keys | identity_keys(target), signature)
+        log(f"Duplicate detected: '{record['title']}' merged into '{target['title']}'")
+        return target, False
+
+
+def dedupe_papers(papers, deduplicator=None):
+    """
+    Deduplicate a batch of Paper objects.
+    Returns the list of unique merged records, in first-seen order.
+    Records already seen by `deduplicator` in earlier batches are not returned again,
+    unless they were never downloaded ('processed' unset) and this batch gave them a PDF source.
+    """
+    if deduplicator is None:
+        deduplicator = PaperDeduplicator()
+    unique = []
+    for paper in papers:
+        record, is_new = deduplicator.add(paper_to_record(paper))
+        if is_new:
+            unique.append(record)
+        elif not record.get('processed') and best_pdf_url(record) and not any(r is record for r in unique):
+            unique.append(record)
+    return [r for r in unique if 'duplicate_of' not in r]
+
@@ -0,0 +1,282 @@
+
+import io
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import datetime
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+from run_telemetry import get_telemetry
+from collect_papers import log, sanitize_filename
+
+# Documents whose extraction takes longer than this (seconds) are captured
+DEFAULT_THRESHOLD_S = 10.0
+# Sampling interval for the 'sample' mode (seconds)
+DEFAULT_SAMPLE_INTERVAL_S = 0.005
+PROFILE_MODES = ['cprofile', 'sample']
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler for a single thread.
+    A background thread snapshots the target thread's stack every `interval` seconds.
+    """
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread = None
+        self._stop = threading.Event()
+        self._target_id = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._target_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="extraction-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        """
+        Stacks in "collapsed" format (flamegraph.pl / speedscope compatible).
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def report(self, top=30):
+        """
+        Text report of the functions most often on top of the stack (self time).
+        """
+        total = sum(self.stacks.values())
+        own = Counter()
+        for stack, count in self.stacks.items():
+            own[stack.rsplit(";", 1)[-1]] += count
+        lines = [f"{total} samples at {self.interval * 1000:.1f} ms interval", "  samples      %  function"]
+        for func, count in own.most_common(top):
+            lines.append(f"  {count:7d} {count / total:6.1%}  {func}")
+        return "\n".join(lines) + "\n"
+
+
+def profile_document(func, content, abstract_text=None, source=None, mode='cprofile'):
+    """
+    Run `func(content, abstract_text, source=source)` under a profiler.
+    Returns (result, capture) where capture holds the timing breakdown and profiler data.
+    Exceptions from `func` are not raised here: they are stored in capture['exception'].
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}'. Choose from {PROFILE_MODES}")
+
+    telemetry = get_telemetry()
+    stages = []
+    started = time.perf_counter()
+
+    def on_stage(stage, seconds, labels):
+        stages.append({"stage": stage, "seconds": round(seconds, 6),
+                       "ended_at_s": round(time.perf_counter() - started, 6), **labels})
+
+    profiler = cProfile.Profile() if mode == 'cprofile' else SamplingProfiler()
+    telemetry.add_listener(on_stage)
+    result, error = None, None
+    if mode == 'cprofile':
+        profiler.enable()
+    else:
+        profiler.start()
+    try:
+        result = func(content, abstract_text, source=source)
+    except Exception as e:
+        error = e
+    finally:
+        if mode == 'cprofile':
+            profiler.disable()
+        else:
+            profiler.stop()
+        telemetry.remove_listener(on_stage)
+
+    capture = {
+        "source": source,
+        "abstract": abstract_text,
+        "mode": mode,
+        "elapsed_s": round(time.perf_counter() - started, 6),
+        "input_bytes": len(content),
+        "result_chars": len(result) if result else 0,
+        "error": repr(error) if error else None,
+        "stages": stages,
+        "profiler": profiler,
+        "exception": error,
+    }
+    return result, capture
+
+
+def format_report(capture, top=30):
+    """
+    Human readable stage breakdown followed by the top profiled functions.
+    """
+    lines = [f"Source: {capture['source']}",
+             f"Error: {capture['error']}" if capture['error'] else "Error: none",
+             f"Elapsed: {capture['elapsed_s']:.3f}s ({capture['input_bytes']} bytes in, {capture['result_chars']} chars out)",
+             "Stage breakdown:"]
+    for s in capture['stages']:
+        labels = ", ".join(f"{k}={v}" for k, v in s.items() if k not in ('stage', 'seconds', 'ended_at_s'))
+        lines.append(f"  {s['stage']:<12} {s['seconds']:9.3f}s  {labels}")
+    lines.append("")
+    profiler = capture['profiler']
+    if isinstance(profiler, SamplingProfiler):
+        lines.append(profiler.report(top))
+    else:
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+        lines.append(stream.getvalue())
+    return "\n".join(lines)
+
+
+def save_capture(capture, content, output_dir, top=30):
+    """
+    Save input PDF, profile and stage breakdown into a new directory under `output_dir`.
+    Returns the capture directory path.
+    """
+    name = os.path.basename(urlparse(capture['source'] or '').path) or 'document'
+    name = sanitize_filename(os.path.splitext(name)[0]).replace(' ', '_')[:60]
+    base_dir = os.path.join(output_dir, f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}_{name}")
+    capture_dir = base_dir
+    suffix = 1
+    while os.path.exists(capture_dir):
+        suffix += 1
+        capture_dir = f"{base_dir}-{suffix}"
+    os.makedirs(capture_dir)
+
+    with open(os.path.join(capture_dir, "input.pdf"), 'wb') as f:
+        f.write(content)
+
+    profiler = capture['profiler']
+    if isinstance(profiler, SamplingProfiler):
+        with open(os.path.join(capture_dir, "profile.collapsed"), 'w', encoding='utf-8') as f:
+            f.write(profiler.collapsed())
+    else:
+        profiler.dump_stats(os.path.join(capture_dir, "profile.prof"))
+
+    with open(os.path.join(capture_dir, "report.txt"), 'w', encoding='utf-8') as f:
+        f.write(format_report(capture, top))
+
+    meta = {k: v for k, v in capture.items() if k not in ('profiler', 'exception')}
+    meta["captured_at"] = datetime.datetime.now().isoformat(timespec='seconds')
+    with open(os.path.join(capture_dir, "capture.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=4)
+
+    return capture_dir
+
+
+class ExtractionProfiler:
+    """
+    Profiling hook for extract_introduction.
+    Every document is profiled; only those slower than `threshold_s` are saved to disk.
+    """
+    def __init__(self, output_dir, threshold_s=DEFAULT_THRESHOLD_S, mode='sample'):
+        self.output_dir = output_dir
+        self.threshold_s = threshold_s
+        self.mode = mode
+
+    def run(self, func, content, abstract_text=None, source=None):
+        result, capture = profile_document(func, content, abstract_text, source=source, mode=self.mode)
+        if capture['elapsed_s'] >= self.threshold_s:
+            capture["threshold_s"] = self.threshold_s
+            # A debugging hook must never change crawl results: saving failures are only logged
+            try:
+                capture_dir = save_capture(capture, content, self.output_dir)
+            except Exception as e:
+                get_telemetry().count("profile_capture_errors_total")
+                log(f"Failed to save profile capture for {source}: {e}")
+            else:
+                get_telemetry().count("profile_captures_total")
+                log(f"Slow document ({capture['elapsed_s']:.1f}s > {self.threshold_s}s). Profile saved to: {capture_dir}")
+        if capture['exception'] is not None:
+            raise capture['exception']
+        return result
+
+
+# Process-wide profiler used by extract_introduction (None = profiling off)
+_profiler = None
+
+
+def get_profiler():
+    return _profiler
+
+
+def configure_profiling(output_dir, threshold_s=DEFAULT_THRESHOLD_S, mode='sample'):
+    """
+    Switch on slow-document capture for this run. Pass output_dir=None to switch it off.
+    The threshold is compared against time measured under the profiler: 'sample' adds
+    almost nothing, 'cprofile' can slow pure-Python parsing down noticeably.
+    """
+    global _profiler
+    if output_dir is None:
+        _profiler = None
+        return None
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}'. Choose from {PROFILE_MODES}")
+    os.makedirs(output_dir, exist_ok=True)
+    _profiler = ExtractionProfiler(output_dir, threshold_s=threshold_s, mode=mode)
+    return _profiler
+
+
+def replay(path, abstract_text=None, mode='cprofile', top=30, output_dir=None):
+    """
+    Re-run extraction offline on a saved capture directory (or a plain PDF file) under the profiler.
+    """
+    from collect_papers import extract_introduction_from_pdf
+
+    source = path
+    if os.path.isdir(path):
+        with open(os.path.join(path, "capture.json"), encoding='utf-8') as f:
+            meta = json.load(f)
+        source = meta.get("source") or path
+        if abstract_text is None:
+            abstract_text = meta.get("abstract")
+        path = os.path.join(path, "input.pdf")
+
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    log(f"Replaying extraction for {path} ({len(content)} bytes, mode={mode})...")
+    result, capture = profile_document(extract_introduction_from_pdf, content, abstract_text, source=source, mode=mode)
+    print(format_report(capture, top))
+    if output_dir:
+        log(f"Capture saved to: {save_capture(capture, content, output_dir, top)}")
+    if capture['exception'] is not None:
+        raise capture['exception']
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay and profile Introduction extraction on a saved document.")
+    parser.add_argument("path", type=str, help="Capture directory (from --profile-dir) or a PDF file.")
+    parser.add_argument("--abstract", type=str, default=None, help="Abstract text (default: taken from capture.json).")
+    parser.add_argument("--mode", type=str, choices=PROFILE_MODES, default="cprofile", help="Profiler to use (default: cprofile).")
+    parser.add_argument("--top", type=int, default=30, help="Number of functions to show (default: 30).")
+    parser.add_argument("--output", type=str, default=None, help="Also save a new capture into this directory.")
+
+    args = parser.parse_args()
+    intro = replay(args.path, abstract_text=args.abstract, mode=args.mode, top=args.top, output_dir=args.output)
+
+    if intro:
+        print("\n--- EXTRACTED INTRODUCTION (first 500 chars) ---")
+        print(intro[:500])
+    else:
+        print("Extraction Failed!")
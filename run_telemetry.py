@@ -0,0 +1,242 @@
+
+import os
+import json
+import math
+import time
+import datetime
+from contextlib import contextmanager
+from collections import defaultdict
+from urllib.parse import urlparse
+
+# Prefix for every exported Prometheus metric
+METRIC_PREFIX = "semantic_crawler"
+
+# Histogram buckets (seconds) for the Prometheus textfile export
+DURATION_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    idx = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in labels)
+    return "{" + inner + "}"
+
+
+class RunTelemetry:
+    """
+    Structured per-stage metrics for a crawl run.
+
+    Everything is aggregated in memory (counters and raw timing samples);
+    if `events_path` is given, every measurement is also appended to it as one JSON line.
+    Cost per measurement is a perf_counter() call and a dict update, so it can stay on.
+    """
+    def __init__(self, events_path=None, run_id=None):
+        self.run_id = run_id or datetime.datetime.now().strftime('%Y%m%dT%H%M%S')
+        self.started = time.time()
+        self.counters = defaultdict(int)    # (name, labels) -> count
+        self.timings = defaultdict(list)    # (stage, labels) -> [seconds, ...]
+        self.host_bytes = defaultdict(int)
+        self.host_seconds = defaultdict(float)
+        self._listeners = []
+        self._events_file = open(events_path, 'a', encoding='utf-8') if events_path else None
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def emit(self, event, **fields):
+        """
+        Write a single JSON-lines event (no-op if no events file is configured).
+        """
+        if self._events_file is None:
+            return
+        record = {"ts": round(time.time(), 6), "run": self.run_id, "event": event}
+        record.update(fields)
+        self._events_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def count(self, name, value=1, **labels):
+        self.counters[(name, _label_key(labels))] += value
+        self.emit("count", name=name, value=value, **labels)
+
+    def observe(self, stage, seconds, **labels):
+        self.timings[(stage, _label_key(labels))].append(seconds)
+        for listener in self._listeners:
+            listener(stage, seconds, labels)
+        self.emit("timing", stage=stage, seconds=round(seconds, 6), **labels)
+
+    def add_listener(self, listener):
+        """
+        Call `listener(stage, seconds, labels)` for every timing observed from now on.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    @contextmanager
+    def stage(self, stage, **labels):
+        """
+        Time a block of code: `with telemetry.stage('search'): ...`
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def observe_download(self, url, num_bytes, seconds, status):
+        """
+        Record one HTTP download, aggregated per host.
+        """
+        host = urlparse(url).netloc or "unknown"
+        self.host_bytes[host] += num_bytes
+        self.host_seconds[host] += seconds
+        self.counters[("download_requests_total", _label_key({"host": host, "status": status}))] += 1
+        self.timings[("download", _label_key({"host": host}))].append(seconds)
+        self.emit("download", host=host, url=url, bytes=num_bytes, seconds=round(seconds, 6), status=status)
+
+    def outcome(self, stage, result, **fields):
+        """
+        Count how a stage ended (e.g. extract / http_403, paper / saved).
+        """
+        self.counters[(f"{stage}_outcome_total", _label_key({"outcome": result}))] += 1
+        self.emit("outcome", stage=stage, outcome=result, **fields)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def counter_total(self, name, **labels):
+        """
+        Sum of a counter over all label sets matching `labels`.
+        """
+        wanted = set(_label_key(labels))
+        return sum(v for (n, lk), v in self.counters.items() if n == name and wanted <= set(lk))
+
+    def summary(self):
+        """
+        End-of-run summary as a plain dict (JSON serializable).
+        """
+        stages = {}
+        for (stage, labels), samples in sorted(self.timings.items()):
+            key = stage + _format_labels(labels)
+            ordered = sorted(samples)
+            stages[key] = {
+                "count": len(ordered),
+                "total_s": round(sum(ordered), 4),
+                "p50_s": round(_percentile(ordered, 50), 4),
+                "p90_s": round(_percentile(ordered, 90), 4),
+                "p99_s": round(_percentile(ordered, 99), 4),
+                "max_s": round(ordered[-1], 4),
+            }
+
+        hosts = {}
+        for host, num_bytes in sorted(self.host_bytes.items()):
+            seconds = self.host_seconds[host]
+            hosts[host] = {
+                "bytes": num_bytes,
+                "seconds": round(seconds, 4),
+                "bytes_per_s": round(num_bytes / seconds, 1) if seconds > 0 else None,
+            }
+
+        # Denominator is every document that reached the parse stage, successful or not
+        parse_attempts = self.counter_total("parse_attempts_total")
+        regex_fallbacks = self.counter_total("regex_fallback_total")
+        outcomes = {}
+        for (name, labels), value in sorted(self.counters.items()):
+            if name.endswith("_outcome_total"):
+                outcomes.setdefault(name[:-len("_outcome_total")], {})[dict(labels)["outcome"]] = value
+
+        return {
+            "run": self.run_id,
+            "wall_time_s": round(time.time() - self.started, 3),
+            "stages": stages,
+            "hosts": hosts,
+            "outcomes": outcomes,
+            "parse_attempts": parse_attempts,
+            "regex_fallbacks": regex_fallbacks,
+            "regex_fallback_rate": round(regex_fallbacks / parse_attempts, 3) if parse_attempts else None,
+        }
+
+    def to_prometheus(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        by_name = defaultdict(list)
+        for (name, labels), value in self.counters.items():
+            by_name[name].append((labels, value))
+        for name in sorted(by_name):
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in sorted(by_name[name]):
+                lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+        metric = f"{METRIC_PREFIX}_download_bytes_total"
+        lines.append(f"# TYPE {metric} counter")
+        for host, num_bytes in sorted(self.host_bytes.items()):
+            lines.append(f"{metric}{_format_labels((('host', host),))} {num_bytes}")
+
+        stages = defaultdict(list)
+        for (stage, labels), samples in self.timings.items():
+            stages[stage].append((labels, samples))
+        for stage in sorted(stages):
+            metric = f"{METRIC_PREFIX}_{stage}_duration_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, samples in sorted(stages[stage]):
+                for bound in DURATION_BUCKETS:
+                    le = labels + (('le', str(bound)),)
+                    lines.append(f"{metric}_bucket{_format_labels(le)} {sum(1 for s in samples if s <= bound)}")
+                lines.append(f"{metric}_bucket{_format_labels(labels + (('le', '+Inf'),))} {len(samples)}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {sum(samples):.6f}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {len(samples)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Write the textfile atomically (node_exporter may read it at any time).
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def close(self):
+        """
+        Emit the summary event and close the events file.
+        """
+        summary = self.summary()
+        self.emit("summary", **summary)
+        if self._events_file is not None:
+            self._events_file.close()
+            self._events_file = None
+        return summary
+
+
+# Process-wide telemetry used by collect_papers. Replaced by configure_telemetry().
+_telemetry = RunTelemetry()
+
+
+def get_telemetry():
+    return _telemetry
+
+
+def configure_telemetry(events_path=None, run_id=None):
+    """
+    Start a fresh telemetry run (optionally writing JSON-lines events) and make it current.
+    """
+    global _telemetry
+    _telemetry = RunTelemetry(events_path=events_path, run_id=run_id)
+    return _telemetry
@@ -1,45 +1,41 @@
-
 import os
-import shutil
 import glob
 import json
+import tempfile
 from collect_papers import search_and_save
+from bench_corpus import generate_corpus
+from bench_server import StandInServer
 
 def test_search_and_save():
-    # Setup: Clear results directory
-    if os.path.exists('results'):
-        shutil.rmtree('results')
-    os.makedirs('results')
+    # Runs fully offline: synthetic corpus served by the local stand-in API/PDF server
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_dir = os.path.join(tmp_dir, 'corpus')
+        results_dir = os.path.join(tmp_dir, 'results')
+        manifest = generate_corpus(corpus_dir, docs_per_layout=1)
+
+        keyword = "Deep Learning"
+        limit = 2
+
+        with StandInServer(corpus_dir, manifest) as server:
+            print(f"Running test with keyword: '{keyword}' and limit: {limit} against {server.api_url}")
+            search_and_save(keyword, limit=limit, output_dir=results_dir, api_url=server.api_url)
+
+        # Verification
+        json_files = glob.glob(os.path.join(results_dir, '*.json'))
+        print(f"Found {len(json_files)} JSON files in results directory.")
+        assert len(json_files) == limit, "Test FAILED: expected files were not created."
 
-    keyword = "Deep Learning" # Using a broad keyword to ensure we find papers with PDFs
-    limit = 2
-    
-    print(f"Running test with keyword: '{keyword}' and limit: {limit}")
-    search_and_save(keyword, limit=limit)
-    
-    # Verification
-    json_files = glob.glob(os.path.join('results', '*.json'))
-    print(f"Found {len(json_files)} JSON files in results directory.")
-    
-    if len(json_files) > 0:
         print("Test PASSED: Files created.")
         for f in json_files:
             print(f"- {f}")
             with open(f, 'r', encoding='utf-8') as json_file:
                 data = json.load(json_file)
-                if not data.get('pdf_link'):
-                    print("  [ERROR] 'pdf_link' is empty!")
-                else:
-                    print(f"  [OK] 'pdf_link': {data['pdf_link']}")
-                
-                if not data.get('introduce'):
-                    print("  [ERROR] 'introduce' is empty!")
-                else:
-                    intro_sample = data['introduce'][:50].replace('\n', ' ')
-                    print(f"  [OK] 'introduce' start: {intro_sample}...")
+                assert data.get('pdf_link'), "'pdf_link' is empty!"
+                print(f"  [OK] 'pdf_link': {data['pdf_link']}")
 
-    else:
-        print("Test FAILED: No files created.")
+                assert data.get('introduction'), "'introduction' is empty!"
+                intro_sample = data['introduction'][:50].replace('\n', ' ')
+                print(f"  [OK] 'introduction' start: {intro_sample}...")
 
 if __name__ == "__main__":
     test_search_and_save()
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+from dedup_papers import PaperDeduplicator, dedupe_papers, best_pdf_url, normalize_title
+
+ABSTRACT = ("We study how large language models can be adapted to detect events in text. "
+            "Our method prompts a pretrained generator to produce synthetic training data, "
+            "which is then used to train a lightweight event detector. Experiments on three "
+            "benchmarks show consistent improvements over strong baselines, especially in "
+            "low-resource settings where annotated data is scarce.")
+
+
+def make_paper(paper_id, title, abstract=ABSTRACT, external_ids=None, pdf_url=None):
+    return SimpleNamespace(
+        paperId=paper_id,
+        title=title,
+        abstract=abstract,
+        externalIds=external_ids or {},
+        openAccessPdf={'url': pdf_url} if pdf_url else None,
+    )
+
+
+def test_normalize_title():
+    assert normalize_title("  Unleash GPT-2 Power for Event Detection! ") == "unleash gpt 2 power for event detection"
+    assert normalize_title("Résumé Parsing") == "resume parsing"
+
+
+def test_merge_preprint_and_published_by_arxiv_doi():
+    preprint = make_paper("a", "Unleash GPT-2 Power for Event Detection",
+                          external_ids={'ArXiv': '2105.00001v2'})
+    published = make_paper("b", "Unleash GPT-2 power for event detection.",
+                           external_ids={'DOI': '10.48550/arXiv.2105.00001'},
+                           pdf_url="https://aclanthology.org/2021.acl-long.490.pdf")
+    records = dedupe_papers([published, preprint])
+    assert len(records) == 1
+    assert records[0]['paperIds'] == ["b", "a"]
+    # ArXiv wins over the publisher's open access PDF once the versions are merged
+    assert best_pdf_url(records[0]) == "https://arxiv.org/pdf/2105.00001v2.pdf"
+
+
+def test_merge_by_similar_abstract():
+    a = make_paper("a", "Event Detection with Generative Models", pdf_url="https://example.org/a.pdf")
+    b = make_paper("b", "Generative Models for Low-Resource Event Detection",
+                   abstract=ABSTRACT.replace("three", "four"))
+    records = dedupe_papers([a, b])
+    assert len(records) == 1
+    assert best_pdf_url(records[0]) == "https://example.org/a.pdf"
+
+
+def test_distinct_papers_are_kept():
+    a = make_paper("a", "Event Detection with Generative Models", external_ids={'DOI': '10.1/one'})
+    b = make_paper("b", "A Survey of Graph Neural Networks", external_ids={'DOI': '10.1/two'},
+                   abstract="Graph neural networks have become the standard tool for learning on "
+                            "relational data. This survey organises recent architectures, training "
+                            "objectives and applications, and discusses open problems in scalability "
+                            "and expressiveness.")
+    assert len(dedupe_papers([a, b])) == 2
+
+
+def test_same_title_with_different_dois_is_kept():
+    a = make_paper("a", "Deep Learning for Medical Image Analysis",
+                   external_ids={'DOI': '10.1016/j.media.2017.07.005'})
+    b = make_paper("b", "Deep learning for medical image analysis",
+                   external_ids={'DOI': '10.1109/ACCESS.2019.2929365'})
+    records = dedupe_papers([a, b])
+    assert len(records) == 2
+    assert [r['externalIds']['DOI'] for r in records] == ['10.1016/j.media.2017.07.005', '10.1109/ACCESS.2019.2929365']
+
+
+def test_duplicates_across_batches_are_not_returned_again():
+    deduplicator = PaperDeduplicator()
+    first = dedupe_papers([make_paper("a", "Event Detection with Generative Models")], deduplicator)
+    second = dedupe_papers([make_paper("a2", "Event detection with generative models")], deduplicator)
+    assert len(first) == 1
+    assert second == []
+    assert deduplicator.duplicates_found == 1
+
+
+def test_unprocessed_record_is_returned_again_when_a_later_batch_adds_a_pdf():
+    deduplicator = PaperDeduplicator()
+    first = dedupe_papers([make_paper("a", "Event Detection with Generative Models",
+                                      external_ids={'DOI': '10.1/x'})], deduplicator)
+    assert len(first) == 1 and best_pdf_url(first[0]) is None
+    # search_and_save leaves records without a PDF unprocessed
+
+    second = dedupe_papers([make_paper("b", "Event Detection with Generative Models (preprint)",
+                                       external_ids={'DOI': '10.1/x', 'ArXiv': '2105.1'})], deduplicator)
+    assert second == [first[0]]
+    assert best_pdf_url(second[0]) == "https://arxiv.org/pdf/2105.1.pdf"
+
+    # Once downloaded, further versions are not returned again
+    second[0]['processed'] = True
+    third = dedupe_papers([make_paper("c", "Event detection with generative models",
+                                      pdf_url="https://example.org/c.pdf")], deduplicator)
+    assert third == []
+
+
+if __name__ == "__main__":
+    test_normalize_title()
+    test_merge_preprint_and_published_by_arxiv_doi()
+    test_merge_by_similar_abstract()
+    test_distinct_papers_are_kept()
+    test_same_title_with_different_dois_is_kept()
+    test_duplicates_across_batches_are_not_returned_again()
+    test_unprocessed_record_is_returned_again_when_a_later_batch_adds_a_pdf()
+    print("All dedup tests passed.")
@@ -0,0 +1,50 @@
+import os
+import json
+import time
+from run_telemetry import get_telemetry
+from profile_extraction import ExtractionProfiler
+
+
+def slow_extract(content, abstract_text=None, source=None):
+    with get_telemetry().stage("parse", strategy="font_aware"):
+        time.sleep(0.02)
+    return "introduction text"
+
+
+def test_slow_document_is_captured(tmp_path):
+    profiler = ExtractionProfiler(str(tmp_path), threshold_s=0.01, mode='sample')
+    result = profiler.run(slow_extract, b"%PDF-1.4 fake", "abstract", source="https://arxiv.org/pdf/2105.00001.pdf")
+    assert result == "introduction text"
+
+    (capture_dir,) = os.listdir(tmp_path)
+    files = set(os.listdir(tmp_path / capture_dir))
+    assert {"input.pdf", "profile.collapsed", "report.txt", "capture.json"} <= files
+    assert (tmp_path / capture_dir / "input.pdf").read_bytes() == b"%PDF-1.4 fake"
+
+    meta = json.loads((tmp_path / capture_dir / "capture.json").read_text(encoding='utf-8'))
+    assert meta["abstract"] == "abstract"
+    assert meta["stages"][0]["stage"] == "parse"
+    assert meta["stages"][0]["strategy"] == "font_aware"
+
+
+def test_fast_document_is_not_captured(tmp_path):
+    profiler = ExtractionProfiler(str(tmp_path), threshold_s=60, mode='cprofile')
+    profiler.run(slow_extract, b"%PDF-1.4 fake")
+    assert os.listdir(tmp_path) == []
+
+
+def test_capture_failure_keeps_result(tmp_path):
+    # output_dir is a file, so creating the capture directory fails
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("x")
+    profiler = ExtractionProfiler(str(blocker), threshold_s=0)
+    assert profiler.run(slow_extract, b"%PDF-1.4 fake") == "introduction text"
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    for test in (test_slow_document_is_captured, test_fast_document_is_not_captured, test_capture_failure_keeps_result):
+        with tempfile.TemporaryDirectory() as d:
+            test(pathlib.Path(d))
+    print("Profiling tests passed.")
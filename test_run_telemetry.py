@@ -0,0 +1,76 @@
+import io
+import json
+import collect_papers
+from pypdf import PdfWriter
+from run_telemetry import RunTelemetry, configure_telemetry, _percentile
+
+
+def test_summary_and_prometheus(tmp_path):
+    events_path = tmp_path / "events.jsonl"
+    telemetry = RunTelemetry(events_path=str(events_path), run_id="test")
+
+    with telemetry.stage("parse", strategy="font_aware"):
+        pass
+    telemetry.observe_download("https://arxiv.org/pdf/2105.00001.pdf", 2048, 0.5, 200)
+    for _ in range(4):
+        telemetry.count("parse_attempts_total")
+    telemetry.count("regex_fallback_total")
+    telemetry.outcome("paper", "saved")
+
+    summary = telemetry.summary()
+    assert summary["stages"]['parse{strategy="font_aware"}']["count"] == 1
+    assert summary["hosts"]["arxiv.org"]["bytes"] == 2048
+    assert summary["outcomes"]["paper"] == {"saved": 1}
+    assert summary["regex_fallback_rate"] == 0.25
+
+    prom = telemetry.to_prometheus()
+    assert 'semantic_crawler_download_bytes_total{host="arxiv.org"} 2048' in prom
+    assert 'semantic_crawler_paper_outcome_total{outcome="saved"} 1' in prom
+    assert 'semantic_crawler_download_duration_seconds_count{host="arxiv.org"} 1' in prom
+
+    telemetry.close()
+    events = [json.loads(line) for line in events_path.read_text(encoding='utf-8').splitlines()]
+    assert [e["event"] for e in events] == ["timing", "download"] + ["count"] * 5 + ["outcome", "summary"]
+    assert all(e["run"] == "test" for e in events)
+
+
+def test_percentile_is_nearest_rank():
+    assert _percentile([1, 2, 3, 4, 5], 50) == 3
+    assert _percentile(list(range(1, 10)), 50) == 5
+    assert _percentile([1, 2, 3, 4, 5], 90) == 5
+    assert _percentile([1, 2, 3, 4], 50) == 2
+    assert _percentile([7], 99) == 7
+    assert _percentile([], 50) is None
+
+
+def test_empty_extraction_is_not_a_success():
+    assert collect_papers._extract_introduction_regex('\nIntroduction\n\nRelated Work\nfoo') == ('regex_standard', '')
+
+    writer = PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    with io.BytesIO() as f:
+        writer.write(f)
+        pdf = f.getvalue()
+
+    telemetry = configure_telemetry(run_id="empty")
+    original = collect_papers._extract_introduction_regex
+    collect_papers._extract_introduction_regex = lambda text, abstract_text=None: ('regex_standard', '')
+    try:
+        assert not collect_papers.extract_introduction_from_pdf(pdf)
+    finally:
+        collect_papers._extract_introduction_regex = original
+
+    summary = telemetry.summary()
+    assert summary["outcomes"]["extract"] == {"no_introduction": 1}
+    assert telemetry.counter_total("extract_strategy_total") == 0
+    assert summary["regex_fallback_rate"] == 1.0
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    with tempfile.TemporaryDirectory() as d:
+        test_summary_and_prometheus(pathlib.Path(d))
+    test_percentile_is_nearest_rank()
+    test_empty_extraction_is_not_a_success()
+    print("Telemetry test passed.")